@@ -0,0 +1,248 @@
+"""
+Local fake of the Atera ticket API for tests and benchmarks.
+
+Serves GET /api/v3/tickets (page, itemsInPage, ticketStatus; newest ticket first,
+like Atera) and GET /api/v3/tickets/<id> from a generated ticket list, plus the
+lookups used for ticket enrichment: /api/v3/tickets/<id>/comments,
+/api/v3/contacts/<id> and /api/v3/customvalues/customerfield/<id>/<field>.
+It can inject latency, throttling (429 with Retry-After) and server errors.
+Point the app at it with ATERA_API_BASE_URL=http://127.0.0.1:<port>/api/v3.
+
+Usage:
+    python benchmarks/fake_atera.py [--port 8081] [--tickets 500] [--latency 0.05]
+                                    [--rate-limit 60] [--error-rate 0.1]
+
+Or from Python:
+    server = FakeAteraServer(tickets=500, latency=0.05).start()
+    ... server.url ...
+    server.add_tickets(10)
+    server.update_ticket(3, TicketStatus='Resolved')
+    server.stop()
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+CUSTOMERS = 20
+CONTACTS = 50
+SLA_TIERS = ('Gold', 'Silver', 'Bronze')
+LOOKUP_PATHS = {
+    'comments': re.compile(r'^/api/v3/tickets/(\d+)/comments$'),
+    'contacts': re.compile(r'^/api/v3/contacts/(\d+)$'),
+    'custom_values': re.compile(r'^/api/v3/customvalues/customerfield/(\d+)/([^/]+)$')
+}
+
+class FakeAteraServer:
+    """Threaded HTTP server imitating the Atera ticket list endpoint"""
+    
+    def __init__(self, host='127.0.0.1', port=0, tickets=500, latency=0.0, latency_jitter=0.0,
+                 rate_limit=None, retry_after=1, throttle_rate=0.0, error_rate=0.0, api_key=None, seed=1):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.rate_limit = rate_limit  # Requests per minute before answering 429
+        self.retry_after = retry_after
+        self.throttle_rate = throttle_rate  # Fraction of requests answered with 429
+        self.error_rate = error_rate  # Fraction of requests answered with 503
+        self.api_key = api_key
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tickets = []
+        self.request_times = []
+        self.stats = {'requests': 0, 'throttled': 0, 'errors': 0, 'comments': 0, 'contacts': 0, 'custom_values': 0}
+        self.add_tickets(tickets)
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+    
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api/v3"
+    
+    def add_tickets(self, count, created_at=None):
+        """Add new tickets (they become the newest ones) and return them"""
+        with self.lock:
+            start = len(self.tickets) + 1
+            base = created_at or datetime.now(timezone.utc)
+            added = [{
+                'TicketID': ticket_id,
+                'TicketTitle': f"Fake ticket {ticket_id}",
+                'TicketCreatedDate': (base + timedelta(seconds=index)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'TicketPriority': ('Low', 'Medium', 'High', 'Critical')[ticket_id % 4],
+                'TicketStatus': 'Open',
+                'CustomerID': ticket_id % CUSTOMERS + 1,
+                'CustomerName': f"Client {ticket_id % CUSTOMERS}",
+                'EndUserID': ticket_id % CONTACTS + 1,
+                'EndUserFirstName': 'Fake',
+                'EndUserLastName': f"User {ticket_id % CONTACTS}",
+                'FirstComment': f"Description of fake ticket {ticket_id}"
+            } for index, ticket_id in enumerate(range(start, start + count))]
+            self.tickets.extend(added)
+        return added
+    
+    def update_ticket(self, ticket_id, **fields):
+        """Change fields of a ticket (Atera field names, e.g. TicketStatus='Closed')"""
+        with self.lock:
+            self.tickets[ticket_id - 1].update(fields)
+    
+    def _throttle(self):
+        """Decide whether this request is answered with 429 or 503"""
+        with self.lock:
+            self.stats['requests'] += 1
+            now = time.monotonic()
+            if self.rate_limit:
+                self.request_times = [t for t in self.request_times if now - t < 60]
+                if len(self.request_times) >= self.rate_limit:
+                    self.stats['throttled'] += 1
+                    return 429
+                self.request_times.append(now)
+            roll = self.random.random()
+            if roll < self.throttle_rate:
+                self.stats['throttled'] += 1
+                return 429
+            if roll < self.throttle_rate + self.error_rate:
+                self.stats['errors'] += 1
+                return 503
+        return None
+    
+    def _page(self, query):
+        page = max(1, int(query.get('page', ['1'])[0]))
+        size = max(1, int(query.get('itemsInPage', ['50'])[0]))
+        status = query.get('ticketStatus', [None])[0]
+        with self.lock:
+            newest_first = [ticket for ticket in self.tickets[::-1] if status is None or ticket['TicketStatus'] == status]
+        total_pages = max(1, -(-len(newest_first) // size))
+        return {
+            'items': newest_first[(page - 1) * size:page * size],
+            'totalItemCount': len(newest_first),
+            'page': page,
+            'itemsInPage': size,
+            'totalPages': total_pages
+        }
+    
+    def _lookup(self, kind, match):
+        """Body of an enrichment lookup, or None if the record doesn't exist"""
+        record_id = int(match.group(1))
+        with self.lock:
+            self.stats[kind] += 1
+            if kind == 'comments':
+                if not 0 < record_id <= len(self.tickets):
+                    return None
+                ticket = self.tickets[record_id - 1]
+                created = datetime.strptime(ticket['TicketCreatedDate'], '%Y-%m-%dT%H:%M:%SZ')
+                comments = [(ticket['FirstComment'], created),
+                            (f"Still down, please call back about ticket {record_id}", created + timedelta(minutes=1))]
+                return {'items': [{'CommentText': text, 'CommentTimestampUTC': at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                                   'EndUserID': ticket['EndUserID'], 'IsInternal': False} for text, at in comments],
+                        'totalItemCount': len(comments), 'page': 1, 'totalPages': 1}
+        if kind == 'contacts':
+            if not 0 < record_id <= CONTACTS:
+                return None
+            return {'EndUserID': record_id, 'CustomerID': record_id % CUSTOMERS + 1, 'Firstname': 'Fake',
+                    'Lastname': f"User {record_id - 1}", 'Email': f"user{record_id}@example.com",
+                    'Phone': f"+1555{record_id:07d}", 'MobilePhone': ''}
+        if not 0 < record_id <= CUSTOMERS:
+            return None
+        return [{'CustomerID': record_id, 'FieldName': unquote(match.group(2)),
+                 'ValueAsString': SLA_TIERS[record_id % len(SLA_TIERS)]}]
+    
+    def _handler_class(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, like the real API
+            disable_nagle_algorithm = True  # Headers and body are written separately
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _send(self, status, body, headers=None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def do_GET(self):
+                if server.latency or server.latency_jitter:
+                    time.sleep(server.latency + server.random.uniform(0, server.latency_jitter))
+                parsed = urlparse(self.path)
+                path = parsed.path.rstrip('/')
+                ticket_id = path[len('/api/v3/tickets/'):] if path.startswith('/api/v3/tickets/') else None
+                lookup = next(((kind, match) for kind, pattern in LOOKUP_PATHS.items()
+                               for match in [pattern.match(path)] if match), None)
+                if path != '/api/v3/tickets' and not (ticket_id and ticket_id.isdigit()) and lookup is None:
+                    return self._send(404, {'message': 'Not found'})
+                if server.api_key and self.headers.get('X-API-KEY') != server.api_key:
+                    return self._send(401, {'message': 'Invalid API key'})
+                status = server._throttle()
+                if status == 429:
+                    return self._send(429, {'message': 'Too many requests'},
+                                      {'Retry-After': str(server.retry_after)})
+                if status == 503:
+                    return self._send(503, {'message': 'Service unavailable'})
+                if lookup is not None:
+                    body = server._lookup(*lookup)
+                    if body is None:
+                        return self._send(404, {'message': 'Not found'})
+                    return self._send(200, body)
+                if ticket_id:
+                    with server.lock:
+                        found = 0 < int(ticket_id) <= len(server.tickets)
+                        ticket = dict(server.tickets[int(ticket_id) - 1]) if found else None
+                    if ticket is None:
+                        return self._send(404, {'message': 'Ticket not found'})
+                    return self._send(200, ticket)
+                self._send(200, server._page(parse_qs(parsed.query)))
+        
+        return Handler
+    
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='fake-atera', daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--tickets', type=int, default=500, help='number of tickets to serve')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='random extra latency, up to this many seconds')
+    parser.add_argument('--rate-limit', type=int, help='requests per minute before answering 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429 responses')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='fraction of requests answered with 429')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--new-ticket-interval', type=float, default=0.0,
+                        help='add a new ticket every this many seconds (0 to disable)')
+    args = parser.parse_args()
+    
+    server = FakeAteraServer(args.host, args.port, args.tickets, args.latency, args.latency_jitter,
+                             args.rate_limit, args.retry_after, args.throttle_rate, args.error_rate).start()
+    print(f"Fake Atera API listening on {server.url} ({args.tickets} tickets)")
+    print("Press Ctrl+C to stop")
+    try:
+        while True:
+            if args.new_ticket_interval:
+                time.sleep(args.new_ticket_interval)
+                server.add_tickets(1)
+            else:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Local fake of the Twilio Messages API for tests and benchmarks.
+
+Accepts POST /2010-04-01/Accounts/<sid>/Messages.json like Twilio (form fields
+To, From and Body, basic auth with the account SID), records every message it
+accepts and can inject latency, throttling (429, Twilio error 20429), rejected
+numbers (400, error 21211) and server errors (500). Point the app at it with
+TWILIO_API_BASE_URL=http://127.0.0.1:<port>.
+
+Usage:
+    python benchmarks/fake_twilio.py [--port 8082] [--latency 0.2] [--error-rate 0.05]
+
+Or from Python:
+    server = FakeTwilioServer(latency=0.2).start()
+    ... server.url ...
+    server.wait_for(10)
+    server.messages
+    server.stop()
+"""
+import argparse
+import base64
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+MESSAGES_PATH = re.compile(r'^/2010-04-01/Accounts/([^/]+)/Messages\.json$')
+
+class FakeTwilioServer:
+    """Threaded HTTP server imitating the Twilio message create endpoint"""
+    
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, latency_jitter=0.0, throttle_rate=0.0,
+                 reject_rate=0.0, error_rate=0.0, invalid_numbers=(), seed=1):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.throttle_rate = throttle_rate  # Fraction of requests answered with 429
+        self.reject_rate = reject_rate  # Fraction of requests rejected as an invalid number
+        self.error_rate = error_rate  # Fraction of requests answered with 500
+        self.invalid_numbers = set(invalid_numbers)  # Always rejected with 21211
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.received = threading.Condition(self.lock)
+        self.messages = []
+        self.stats = {'requests': 0, 'accepted': 0, 'throttled': 0, 'rejected': 0, 'errors': 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+    
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def wait_for(self, count, timeout=30):
+        """Wait until count messages were accepted; returns whether they were"""
+        deadline = time.monotonic() + timeout
+        with self.received:
+            while len(self.messages) < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.received.wait(remaining)
+        return True
+    
+    def reset(self):
+        with self.lock:
+            self.messages = []
+            self.stats = dict.fromkeys(self.stats, 0)
+    
+    def _outcome(self, to_number):
+        """Decide whether this request is accepted, or answered with an error status and code"""
+        with self.lock:
+            self.stats['requests'] += 1
+            roll = self.random.random()
+            if roll < self.throttle_rate:
+                self.stats['throttled'] += 1
+                return 429, 20429, 'Too Many Requests'
+            if to_number in self.invalid_numbers or roll < self.throttle_rate + self.reject_rate:
+                self.stats['rejected'] += 1
+                return 400, 21211, f"The 'To' number {to_number} is not a valid phone number."
+            if roll < self.throttle_rate + self.reject_rate + self.error_rate:
+                self.stats['errors'] += 1
+                return 500, 20500, 'Internal Server Error'
+        return None
+    
+    def _accept(self, account_sid, fields):
+        now = datetime.now(timezone.utc)
+        with self.received:
+            self.stats['accepted'] += 1
+            sid = f"SM{len(self.messages) + 1:032x}"
+            message = {
+                'sid': sid,
+                'account_sid': account_sid,
+                'to': fields.get('To'),
+                'from': fields.get('From'),
+                'body': fields.get('Body'),
+                'status': 'queued',
+                'num_segments': str(max(1, -(-len(fields.get('Body') or '') // 153))),
+                'direction': 'outbound-api',
+                'api_version': '2010-04-01',
+                'date_created': format_datetime(now),
+                'date_updated': format_datetime(now),
+                'uri': f"/2010-04-01/Accounts/{account_sid}/Messages/{sid}.json",
+                'received_at': time.time()
+            }
+            self.messages.append(message)
+            self.received.notify_all()
+        return message
+    
+    def _handler_class(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, like the real API
+            disable_nagle_algorithm = True  # Headers and body are written separately
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _send(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def _error(self, status, code, message):
+                self._send(status, {'code': code, 'message': message, 'status': status,
+                                    'more_info': f"https://www.twilio.com/docs/errors/{code}"})
+            
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                fields = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+                if server.latency or server.latency_jitter:
+                    time.sleep(server.latency + server.random.uniform(0, server.latency_jitter))
+                match = MESSAGES_PATH.match(self.path.split('?')[0])
+                if not match:
+                    return self._error(404, 20404, 'The requested resource was not found')
+                account_sid = match.group(1)
+                try:
+                    scheme, credentials = self.headers.get('Authorization', '').split(' ', 1)
+                    username = base64.b64decode(credentials).decode().split(':', 1)[0]
+                except ValueError:
+                    scheme, username = None, None
+                if scheme != 'Basic' or username != account_sid:
+                    return self._error(401, 20003, 'Authenticate')
+                if not fields.get('To') or not fields.get('Body'):
+                    return self._error(400, 21604, "A 'To' phone number and a 'Body' are required.")
+                outcome = server._outcome(fields['To'])
+                if outcome:
+                    return self._error(*outcome)
+                message = server._accept(account_sid, fields)
+                self._send(201, {key: value for key, value in message.items() if key != 'received_at'})
+        
+        return Handler
+    
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='fake-twilio', daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8082)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='random extra latency, up to this many seconds')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='fraction of requests answered with 429')
+    parser.add_argument('--reject-rate', type=float, default=0.0, help='fraction of requests rejected as invalid numbers')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 500')
+    args = parser.parse_args()
+    
+    server = FakeTwilioServer(args.host, args.port, args.latency, args.latency_jitter, args.throttle_rate,
+                              args.reject_rate, args.error_rate).start()
+    print(f"Fake Twilio API listening on {server.url}")
+    print("Press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(5)
+            print(json.dumps(server.stats))
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
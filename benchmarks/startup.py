@@ -0,0 +1,123 @@
+"""
+Startup-time benchmark.
+
+Starts the app in fresh Python processes against a scratch database (migrated
+once beforehand, like an existing install) and measures:
+
+- web: interpreter startup, importing app.py, and serving the first request
+  (which binds the database and checks the schema)
+- worker: importing app.py and start_worker() returning, i.e. how quickly a
+  worker is back after a crash; each process exits without shutting down, so
+  the next one starts the way it would after a crash
+
+"ready" is the time from spawning the process until it got that far. Timings
+are in milliseconds. Results are written as JSON and can be compared with an
+earlier run like the end-to-end suite (suite.py).
+
+Usage:
+    python benchmarks/startup.py [--runs 10] [--output startup.json]
+                                 [--compare baseline.json] [--threshold 0.25] [--fail-on-regression]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from suite import compare, git_revision, percentiles
+
+PHASES = ('web', 'worker')
+
+# Runs in each child process; prints one JSON line of timings in seconds
+CHILD = r"""
+import json, os, sys, time
+spawned_at = float(os.environ['STARTUP_SPAWNED_AT'])
+started = time.perf_counter()
+result = {'interpreter': time.time() - spawned_at}
+sys.path.insert(0, os.environ['STARTUP_ROOT'])
+import app as oncall
+imported = time.perf_counter()
+result['import'] = imported - started
+if sys.argv[1] == 'web':
+    status = oncall.app.test_client().get('/login').status_code
+    if status != 200:
+        sys.exit(f"GET /login returned {status}")
+    result['first_request'] = time.perf_counter() - imported
+else:
+    oncall.start_worker()
+    result['start_worker'] = time.perf_counter() - imported
+result['ready'] = time.time() - spawned_at
+result['modules'] = len(sys.modules)
+print(json.dumps(result), flush=True)
+os._exit(0)  # Like a crash: no shutdown, the poller lease is left behind
+"""
+
+def run_child(phase, env):
+    env = dict(env, STARTUP_SPAWNED_AT=repr(time.time()))
+    process = subprocess.run([sys.executable, '-c', CHILD, phase], env=env, capture_output=True,
+                             text=True, timeout=120)
+    if process.returncode != 0:
+        raise RuntimeError(f"{phase} process failed:\n{process.stderr}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+def run_phase(phase, env, runs):
+    """Start runs processes for the phase; percentiles of each timing, in milliseconds"""
+    samples = [run_child(phase, env) for _ in range(runs)]
+    result = {name: percentiles([sample[name] for sample in samples])
+              for name in samples[0] if name != 'modules'}
+    result['modules'] = samples[-1]['modules']
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phases', default=','.join(PHASES), help='comma-separated phases to run')
+    parser.add_argument('--runs', type=int, default=10, help='processes started per phase')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='earlier results file to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25, help='relative change counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit with status 1 on regressions')
+    args = parser.parse_args()
+    phases = [phase.strip() for phase in args.phases.split(',') if phase.strip()]
+    unknown = set(phases) - set(PHASES)
+    if unknown:
+        parser.error(f"unknown phases: {', '.join(sorted(unknown))}")
+    
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    workdir = tempfile.mkdtemp(prefix='oncall-startup-')
+    env = dict(os.environ, STARTUP_ROOT=root,
+               DATABASE_URL=os.getenv('BENCH_DATABASE_URL', f"sqlite:///{os.path.join(workdir, 'startup.db')}"))
+    
+    # Untimed: creates the schema and compiles app.py to bytecode, as on an existing install
+    run_child('web', env)
+    
+    results = {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(root),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'database': env['DATABASE_URL'].split(':', 1)[0],
+        'parameters': {'runs': args.runs},
+        'scenarios': {}
+    }
+    for phase in PHASES:
+        if phase in phases:
+            print(f"Running {phase}...")
+            results['scenarios'][phase] = run_phase(phase, env, args.runs)
+    
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
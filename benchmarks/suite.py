@@ -0,0 +1,398 @@
+"""
+End-to-end benchmark suite.
+
+Runs the app in-process on a scratch database filled with synthetic data
+(synthetic_data.py), against a fake Atera API (fake_atera.py) and a fake Twilio
+API (fake_twilio.py), and measures:
+
+- poll: the initial sync and incremental polls (tickets per second, latency,
+  Atera requests, SQL statements and database time per poll)
+- ingest_to_sms: time from a poll picking up new tickets to their SMS reaching
+  Twilio, and from queuing an SMS to sending it (each ticket is paged separately
+  unless --digest-window is set)
+- calendar: is_business_hours and get_current_on_call latency against years of
+  schedules and holidays, with cold and warm caches
+- dashboard: latency and SQL statements per request for the dashboard pages
+  and the ticket API, unchanged, right after a data change, and as 304s
+
+Results are written as JSON. Pass an earlier result file with --compare to list
+metrics that got worse by more than --threshold (e.g. between releases).
+
+Usage:
+    python benchmarks/suite.py [--scenarios poll,ingest_to_sms,calendar,dashboard]
+                               [--tickets 2000] [--atera-latency 0.05] [--twilio-latency 0.15]
+                               [--twilio-error-rate 0.0] [--digest-window 0] [--output results.json]
+                               [--compare baseline.json] [--threshold 0.25] [--fail-on-regression]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from fake_atera import FakeAteraServer
+from fake_twilio import FakeTwilioServer
+from synthetic_data import populate
+
+SCENARIOS = ('poll', 'ingest_to_sms', 'calendar', 'dashboard')
+
+# Metrics compared with --compare (p99, max and single cold timings are too noisy);
+# throughput is better when higher, everything else when lower
+COMPARED_PERCENTILES = ('p50', 'p95', 'mean')
+
+def percentiles(values, scale=1000, digits=1):
+    """p50/p95/p99/max/mean of values in seconds, scaled (milliseconds by default)"""
+    values = sorted(values)
+    if not values:
+        return {}
+    def at(fraction):
+        return round(values[min(len(values) - 1, int(fraction * len(values)))] * scale, digits)
+    return {'p50': at(0.5), 'p95': at(0.95), 'p99': at(0.99), 'max': at(1.0),
+            'mean': round(statistics.mean(values) * scale, digits)}
+
+def business_time(oncall):
+    """10:00 local time on the most recent day (before today) that is open until 17:00, in UTC"""
+    tz = oncall.get_timezone()
+    day = datetime.now(tz).date() - timedelta(days=1)
+    while not (oncall.is_business_hours(datetime.combine(day, datetime.min.time()) + timedelta(hours=10)) and
+               oncall.is_business_hours(datetime.combine(day, datetime.min.time()) + timedelta(hours=16))):
+        day -= timedelta(days=1)
+    local = tz.localize(datetime.combine(day, datetime.min.time()) + timedelta(hours=10))
+    return local.astimezone(timezone.utc)
+
+def timed_poll(oncall, atera):
+    """Run one Atera sync; return (new tickets, seconds, SQL statements, database seconds, Atera requests)"""
+    requests_before = atera.stats['requests']
+    with oncall.tracer.span('benchmark.poll') as span:
+        try:
+            new_tickets = oncall.fetch_tickets_from_atera()
+        except oncall.AteraAPIError:
+            # Every retry failed (injected errors); the next poll picks the tickets up
+            new_tickets = []
+    return len(new_tickets), span.duration, span.db_statements, span.db_time, atera.stats['requests'] - requests_before
+
+def run_poll(args, oncall, atera):
+    """Initial sync of --tickets tickets, then polls with and without new tickets"""
+    with oncall.app.app_context():
+        # Tickets created during business hours, so polling isn't mixed up with sending SMS
+        base = business_time(oncall)
+        atera.add_tickets(args.tickets, created_at=base)
+        count, seconds, statements, db_time, requests = timed_poll(oncall, atera)
+        results = {'initial_sync': {
+            'tickets': count,
+            'pages': oncall.get_last_sync_stats().get('pages_fetched'),
+            'atera_requests': requests,
+            'duration_ms': round(seconds * 1000, 1),
+            'tickets_per_second': round(count / seconds) if seconds else None,
+            'db_ms': round(db_time * 1000, 1),
+            'db_statements': statements
+        }}
+        
+        for name, new_per_poll in (('incremental_poll', args.new_per_poll), ('idle_poll', 0)):
+            durations, statements_per_poll, db_times, requests_per_poll = [], [], [], []
+            for _ in range(args.polls):
+                if new_per_poll:
+                    atera.add_tickets(new_per_poll, created_at=base + timedelta(seconds=len(atera.tickets)))
+                count, seconds, statements, db_time, requests = timed_poll(oncall, atera)
+                durations.append(seconds)
+                statements_per_poll.append(statements)
+                db_times.append(db_time)
+                requests_per_poll.append(requests)
+            results[name] = {
+                'polls': args.polls,
+                'new_tickets_per_poll': new_per_poll,
+                'duration_ms': percentiles(durations),
+                'db_ms': percentiles(db_times),
+                'db_statements': {'mean': round(statistics.mean(statements_per_poll), 1), 'max': max(statements_per_poll)},
+                'atera_requests': {'mean': round(statistics.mean(requests_per_poll), 1), 'max': max(requests_per_poll)}
+            }
+    return results
+
+def wait_for_outbox(oncall, timeout=60):
+    """Wait until the SMS workers have sent (or failed) every queued or held notification"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with oncall.app.app_context():
+            # Release digests when due, like a worker's scheduled job
+            if oncall.release_held_notifications():
+                oncall.notification_dispatcher.dispatch_pending()
+            pending = oncall.Notification.query.filter(
+                oncall.Notification.status.in_(('held', 'queued', 'sending'))
+            ).count()
+        if not pending:
+            return True
+        time.sleep(0.01)
+    return False
+
+def run_ingest_to_sms(args, oncall, atera, twilio):
+    """Rounds of --batch new tickets on a holiday, so every ticket pages the primary on-call tier"""
+    with oncall.app.app_context():
+        holiday = oncall.Holiday(name='Benchmark Holiday', date=date.today())
+        oncall.db.session.add(holiday)
+        oncall.bump_schedule_version()
+        oncall.db.session.commit()
+        holiday_id = holiday.id
+        recipients = len(next(iter(oncall.get_on_call_tiers().values()), []))
+        first_notification_id = oncall.db.session.query(oncall.db.func.max(oncall.Notification.id)).scalar() or 0
+    
+    twilio.reset()
+    to_twilio, poll_durations, timed_out = [], [], 0
+    for _ in range(args.rounds):
+        messages_before = len(twilio.messages)
+        atera.add_tickets(args.batch)
+        poll_started = time.time()
+        with oncall.app.app_context():
+            count, seconds, _, _, _ = timed_poll(oncall, atera)
+        poll_durations.append(seconds)
+        if not wait_for_outbox(oncall):
+            timed_out += 1
+        to_twilio.extend(message['received_at'] - poll_started for message in twilio.messages[messages_before:])
+        time.sleep(args.pause)
+    
+    with oncall.app.app_context():
+        notifications = oncall.Notification.query.filter(oncall.Notification.id > first_notification_id).all()
+        queue_to_send = [(n.sent_at - n.created_at).total_seconds() for n in notifications if n.sent_at]
+        outcomes = {}
+        for notification in notifications:
+            key = notification.status if not notification.error_code else f"{notification.status} {notification.error_code}"
+            outcomes[key] = outcomes.get(key, 0) + 1
+        oncall.db.session.delete(oncall.db.session.get(oncall.Holiday, holiday_id))
+        oncall.bump_schedule_version()
+        oncall.db.session.commit()
+    
+    return {
+        'rounds': args.rounds,
+        'tickets_per_round': args.batch,
+        'recipients_per_ticket': recipients,
+        'notifications': outcomes,
+        'rounds_timed_out': timed_out,
+        'twilio': dict(twilio.stats),
+        'poll_duration_ms': percentiles(poll_durations),
+        'poll_to_twilio_ms': percentiles(to_twilio),
+        'queue_to_send_ms': percentiles(queue_to_send)
+    }
+
+def run_calendar(args, oncall):
+    """Business hours and on-call lookups, now and at random times over the generated years"""
+    rng = random.Random(args.seed)
+    now = datetime.now()
+    earliest = now - timedelta(days=365 * args.years)
+    random_times = [earliest + timedelta(seconds=rng.randrange(int((now - earliest).total_seconds())))
+                    for _ in range(args.calls)]
+    results = {}
+    with oncall.app.app_context():
+        # First call after a schedule change rebuilds the compiled calendar and on-call index
+        oncall.bump_schedule_version()
+        oncall.db.session.commit()
+        oncall.get_data_version()
+        for name, func in (('is_business_hours', oncall.is_business_hours),
+                           ('get_current_on_call', oncall.get_current_on_call)):
+            start = time.perf_counter()
+            func()
+            cold = time.perf_counter() - start
+            samples = {'now': [], 'random_time': []}
+            for at in random_times:
+                start = time.perf_counter()
+                func()
+                samples['now'].append(time.perf_counter() - start)
+                start = time.perf_counter()
+                func(at)
+                samples['random_time'].append(time.perf_counter() - start)
+            results[name] = {
+                'cold_ms': round(cold * 1000, 2),
+                'now_us': percentiles(samples['now'], 1000000),
+                'random_time_us': percentiles(samples['random_time'], 1000000)
+            }
+    return results
+
+def run_dashboard(args, oncall):
+    """Dashboard pages and the ticket API through the Flask test client"""
+    with oncall.app.app_context():
+        if not oncall.User.query.filter_by(username='benchmark').first():
+            oncall.db.session.add(oncall.User(username='benchmark', password='benchmark', is_admin=True))
+            oncall.db.session.commit()
+    client = oncall.app.test_client()
+    client.post('/login', data={'username': 'benchmark', 'password': 'benchmark'})
+    
+    def request(path, headers=None):
+        with oncall.tracer.span('benchmark.request') as span:
+            response = client.get(path, headers=headers)
+            response.get_data()
+        return response, span
+    
+    results = {}
+    for path in args.pages:
+        response, _ = request(path)
+        if response.status_code != 200:
+            results[path] = {'status': response.status_code}
+            continue
+        modes = {'unchanged': [], 'after_change': [], 'not_modified': []}
+        statements = {mode: [] for mode in modes}
+        for _ in range(args.requests):
+            _, span = request(path)
+            modes['unchanged'].append(span.duration)
+            statements['unchanged'].append(span.db_statements)
+            
+            # A new ticket or schedule change invalidates the ETag and cached fragments
+            with oncall.app.app_context():
+                oncall.bump_data_version()
+                oncall.db.session.commit()
+            response, span = request(path)
+            modes['after_change'].append(span.duration)
+            statements['after_change'].append(span.db_statements)
+            
+            etag = response.headers.get('ETag')
+            if etag:
+                response, span = request(path, {'If-None-Match': etag})
+                if response.status_code == 304:
+                    modes['not_modified'].append(span.duration)
+                    statements['not_modified'].append(span.db_statements)
+        results[path] = {f"{mode}_ms": percentiles(samples) for mode, samples in modes.items() if samples}
+        results[path].update({f"{mode}_db_statements": round(statistics.mean(counts), 1)
+                              for mode, counts in statements.items() if counts})
+    return results
+
+def flatten(results, prefix=''):
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            yield from flatten(value, name)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+def compare(results, baseline, threshold):
+    """Print how every compared metric changed; return the ones that got worse by more than threshold"""
+    previous = dict(flatten(baseline.get('scenarios', {})))
+    regressions = []
+    print(f"\nCompared with {baseline.get('revision') or 'baseline'} from {baseline.get('started_at')}:")
+    for name, value in flatten(results['scenarios']):
+        old = previous.get(name)
+        compared = name.rsplit('.', 1)[-1] in COMPARED_PERCENTILES or 'statements' in name or 'per_second' in name
+        if old is None or not compared:
+            continue
+        if old == 0:
+            change = 0.0 if value == 0 else float('inf')
+        else:
+            change = (value - old) / old
+        worse = -change if 'per_second' in name else change
+        flag = ''
+        if worse > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif worse < -threshold:
+            flag = '  improved'
+        print(f"  {name}: {old} -> {value} ({change:+.0%}){flag}")
+    return regressions
+
+def git_revision(root):
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=root, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated scenarios to run')
+    parser.add_argument('--technicians', type=int, default=20)
+    parser.add_argument('--years', type=int, default=3, help='years of schedules, holidays and historical tickets')
+    parser.add_argument('--history', type=int, default=20000, help='historical tickets in the database')
+    parser.add_argument('--tickets', type=int, default=2000, help='open tickets served by the fake Atera API')
+    parser.add_argument('--polls', type=int, default=20, help='incremental and idle polls to time')
+    parser.add_argument('--new-per-poll', type=int, default=5, help='new tickets before each incremental poll')
+    parser.add_argument('--rounds', type=int, default=10, help='ingest-to-SMS rounds')
+    parser.add_argument('--batch', type=int, default=20, help='new tickets per ingest-to-SMS round')
+    parser.add_argument('--pause', type=float, default=0.2, help='seconds between ingest-to-SMS rounds')
+    parser.add_argument('--calls', type=int, default=2000, help='calls per calendar lookup')
+    parser.add_argument('--requests', type=int, default=30, help='requests per dashboard page and mode')
+    parser.add_argument('--pages', default='/,/tickets,/api/tickets,/oncall,/holidays,/tickets/search?q=printer',
+                        help='comma-separated dashboard paths')
+    parser.add_argument('--atera-latency', type=float, default=0.05, help='seconds added to every Atera response')
+    parser.add_argument('--atera-error-rate', type=float, default=0.0, help='fraction of Atera requests answered with 503')
+    parser.add_argument('--atera-throttle-rate', type=float, default=0.0, help='fraction of Atera requests answered with 429')
+    parser.add_argument('--twilio-latency', type=float, default=0.15, help='seconds added to every Twilio response')
+    parser.add_argument('--twilio-error-rate', type=float, default=0.0, help='fraction of Twilio requests answered with 500')
+    parser.add_argument('--twilio-reject-rate', type=float, default=0.0, help='fraction of SMS rejected as invalid numbers')
+    parser.add_argument('--digest-window', type=int, default=0,
+                        help='seconds new tickets may be held for a digest SMS (0 pages each ticket)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='earlier results file to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25, help='relative change counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit with status 1 on regressions')
+    args = parser.parse_args()
+    args.pages = [page for page in args.pages.split(',') if page]
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    
+    atera = FakeAteraServer(tickets=0, latency=args.atera_latency, error_rate=args.atera_error_rate,
+                            throttle_rate=args.atera_throttle_rate, retry_after=0, seed=args.seed).start()
+    twilio = FakeTwilioServer(latency=args.twilio_latency, error_rate=args.twilio_error_rate,
+                              reject_rate=args.twilio_reject_rate, seed=args.seed).start()
+    
+    # Point the app at a scratch database and the fake APIs before importing it
+    workdir = tempfile.mkdtemp(prefix='oncall-bench-')
+    os.environ['DATABASE_URL'] = os.getenv('BENCH_DATABASE_URL', f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    os.environ['ATERA_API_BASE_URL'] = atera.url
+    os.environ['TWILIO_API_BASE_URL'] = twilio.url
+    os.environ['DIGEST_WINDOW_SECONDS'] = str(args.digest_window)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, root)
+    import app as oncall
+    
+    print("Generating synthetic data...")
+    data = populate(args.technicians, args.years, tickets=args.history, seed=args.seed)
+    with oncall.app.app_context():
+        for key, value in (('atera_api_key', 'benchmark'), ('twilio_account_sid', 'ACbenchmark'),
+                           ('twilio_auth_token', 'benchmark'), ('twilio_phone_number', '+15550000000')):
+            oncall.save_setting(key, value)
+        database = oncall.db.engine.dialect.name
+    
+    results = {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(root),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'database': database,
+        'data': data,
+        'parameters': {key: value for key, value in vars(args).items()
+                       if key not in ('output', 'compare', 'fail_on_regression')},
+        'scenarios': {}
+    }
+    runners = {
+        'poll': lambda: run_poll(args, oncall, atera),
+        'ingest_to_sms': lambda: run_ingest_to_sms(args, oncall, atera, twilio),
+        'calendar': lambda: run_calendar(args, oncall),
+        'dashboard': lambda: run_dashboard(args, oncall)
+    }
+    # Run in a fixed order: the dashboard and ingest scenarios use the tickets stored by the poll scenario
+    for name in SCENARIOS:
+        if name in scenarios:
+            print(f"Running {name}...")
+            results['scenarios'][name] = runners[name]()
+    
+    oncall.notification_dispatcher.executor.shutdown(wait=True)
+    atera.stop()
+    twilio.stop()
+    
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
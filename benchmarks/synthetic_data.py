@@ -0,0 +1,116 @@
+"""
+Synthetic data for benchmarks: technicians, years of on-call schedules,
+holidays, business hours and historical tickets.
+
+Call populate() with the app imported against a scratch database, or run it
+directly to fill the database in DATABASE_URL (e.g. for trying the dashboard
+with realistic volumes).
+
+Usage:
+    python benchmarks/synthetic_data.py [--technicians 20] [--years 3] [--tickets 50000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import date, datetime, time, timedelta
+
+# Fixed-date holidays generated for every year
+HOLIDAYS = [
+    ('New Year', 1, 1), ('Spring Holiday', 4, 15), ('Labour Day', 5, 1), ('Summer Holiday', 7, 4),
+    ('Harvest Day', 9, 1), ('Founders Day', 10, 12), ('Remembrance Day', 11, 11),
+    ('Christmas Eve', 12, 24), ('Christmas Day', 12, 25), ('New Year Eve', 12, 31)
+]
+
+def populate(technicians=20, years=3, tiers=2, shift_days=7, tickets=0, seed=1):
+    """
+    Fill the app's database with synthetic data and return a summary.
+    
+    Schedules cover the past years and the next 90 days in shifts of shift_days,
+    with one technician per tier on every shift (rotating through everyone).
+    Historical tickets are closed, spread over the same years and get ticket IDs
+    far above the ones a fake Atera server hands out.
+    """
+    from app import (app, db, BusinessHours, Holiday, OnCallSchedule, Technician, Ticket,
+                     bump_schedule_version, invalidate_business_calendar)
+    
+    rng = random.Random(seed)
+    today = date.today()
+    first_day = today - timedelta(days=365 * years)
+    with app.app_context():
+        staff = [Technician(name=f"Technician {i + 1}", phone=f"+1555{i + 1:07d}",
+                            email=f"technician{i + 1}@example.com") for i in range(technicians)]
+        db.session.add_all(staff)
+        db.session.flush()
+        
+        if BusinessHours.query.count() == 0:
+            db.session.add_all([BusinessHours(day_of_week=day, start_time=time(9), end_time=time(17))
+                                for day in range(5)])
+        
+        schedules = []
+        start = datetime.combine(first_day, time(9))
+        end_of_schedules = datetime.combine(today + timedelta(days=90), time(9))
+        shift = 0
+        while start < end_of_schedules:
+            end = start + timedelta(days=shift_days)
+            for tier in range(1, min(tiers, technicians) + 1):
+                technician = staff[(shift + (tier - 1) * max(1, technicians // tiers)) % technicians]
+                schedules.append({'technician_id': technician.id, 'start_date': start, 'end_date': end, 'tier': tier})
+            start = end
+            shift += 1
+        if schedules:
+            db.session.execute(OnCallSchedule.__table__.insert(), schedules)
+        
+        holidays = [{'name': name, 'date': date(year, month, day), 'notified': False}
+                    for year in range(first_day.year, today.year + 2)
+                    for name, month, day in HOLIDAYS
+                    if first_day <= date(year, month, day) <= today + timedelta(days=365)
+                    and date(year, month, day) != today]
+        if holidays:
+            db.session.execute(Holiday.__table__.insert(), holidays)
+        
+        clients = [f"Client {i}" for i in range(50)]
+        span_seconds = int((datetime.now() - datetime.combine(first_day, time())).total_seconds())
+        batch = []
+        for i in range(tickets):
+            batch.append({
+                'ticket_id': str(100000000 + i),
+                'title': f"Historical ticket {i + 1}: {rng.choice(['VPN', 'Printer', 'Email', 'Laptop', 'Server'])} issue",
+                'description': f"Synthetic historical ticket {i + 1}",
+                'created_at': datetime.combine(first_day, time()) + timedelta(seconds=rng.randrange(span_seconds)),
+                'priority': rng.choice(('Low', 'Medium', 'High', 'Critical')),
+                'status': rng.choice(('Closed', 'Resolved')),
+                'client': rng.choice(clients),
+                'user': f"User {rng.randrange(500)}",
+                'notified': rng.random() < 0.2
+            })
+            if len(batch) == 10000:
+                db.session.execute(Ticket.__table__.insert(), batch)
+                batch = []
+        if batch:
+            db.session.execute(Ticket.__table__.insert(), batch)
+        
+        # Schedules, holidays and tickets were inserted in bulk: invalidate the in-process caches
+        bump_schedule_version()
+        db.session.commit()
+        invalidate_business_calendar()
+    
+    return {'technicians': technicians, 'schedules': len(schedules), 'holidays': len(holidays),
+            'tickets': tickets, 'years': years}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--technicians', type=int, default=20)
+    parser.add_argument('--years', type=int, default=3, help='years of schedules, holidays and tickets')
+    parser.add_argument('--tiers', type=int, default=2, help='on-call tiers per shift')
+    parser.add_argument('--shift-days', type=int, default=7)
+    parser.add_argument('--tickets', type=int, default=50000, help='historical (closed) tickets')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    print(json.dumps(populate(args.technicians, args.years, args.tiers, args.shift_days, args.tickets, args.seed)))
+
+if __name__ == '__main__':
+    main()
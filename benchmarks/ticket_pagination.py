@@ -0,0 +1,90 @@
+"""
+Benchmark for the keyset-paginated ticket listing.
+
+Fills a scratch database with synthetic tickets and times fetching a page at
+increasing depths with keyset pagination (query_ticket_page) and, for
+comparison, with LIMIT/OFFSET. Keyset pages should cost the same at any depth.
+
+Usage:
+    python benchmarks/ticket_pagination.py [--tickets 200000] [--repeat 20] [--output results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickets', type=int, default=200000, help='number of synthetic tickets')
+    parser.add_argument('--repeat', type=int, default=20, help='timed repetitions per page')
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+    
+    # Point the app at a scratch database before importing it
+    workdir = tempfile.mkdtemp(prefix='oncall-bench-')
+    os.environ['DATABASE_URL'] = os.getenv('BENCH_DATABASE_URL', f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from app import app, db, Ticket, query_ticket_page
+    
+    with app.app_context():
+        print(f"Inserting {args.tickets} tickets...")
+        start = datetime(2020, 1, 1)
+        clients = [f'Client {i}' for i in range(50)]
+        batch = []
+        for i in range(args.tickets):
+            batch.append({
+                'ticket_id': str(i + 1),
+                'title': f'Synthetic ticket {i + 1}',
+                'created_at': start + timedelta(minutes=i),
+                'priority': ('Low', 'Medium', 'High', 'Critical')[i % 4],
+                'status': 'Open',
+                'client': clients[i % len(clients)],
+                'user': 'Bench User',
+                'notified': i % 7 == 0
+            })
+            if len(batch) == 10000:
+                db.session.execute(Ticket.__table__.insert(), batch)
+                batch = []
+        if batch:
+            db.session.execute(Ticket.__table__.insert(), batch)
+        db.session.commit()
+        
+        def timed(func):
+            samples = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                func()
+                samples.append((time.perf_counter() - t0) * 1000)
+            return round(statistics.median(samples), 3)
+        
+        results = {'tickets': args.tickets, 'page_size': args.page_size, 'repeat': args.repeat, 'pages': []}
+        ordered = Ticket.query.order_by(Ticket.created_at.desc(), Ticket.id.desc())
+        for depth in sorted({0, args.tickets // 10, args.tickets // 2, max(0, args.tickets - args.page_size - 1)}):
+            # Cursor for the row just above the page (not timed)
+            cursor = None
+            if depth:
+                anchor = ordered.offset(depth - 1).first()
+                cursor = (anchor.created_at, anchor.id)
+            keyset_ms = timed(lambda: query_ticket_page({}, cursor, args.page_size))
+            offset_ms = timed(lambda: ordered.offset(depth).limit(args.page_size).all())
+            filtered_ms = timed(lambda: query_ticket_page({'client': 'Client 7'}, cursor, args.page_size))
+            results['pages'].append({
+                'offset': depth,
+                'keyset_ms': keyset_ms,
+                'keyset_filtered_ms': filtered_ms,
+                'limit_offset_ms': offset_ms
+            })
+            print(f"offset {depth:>8}: keyset {keyset_ms:8.3f} ms | keyset+client filter {filtered_ms:8.3f} ms | LIMIT/OFFSET {offset_ms:8.3f} ms")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
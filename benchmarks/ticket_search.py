@@ -0,0 +1,101 @@
+"""
+Benchmark for full-text ticket search.
+
+Fills a scratch database with synthetic tickets and times ranked full-text
+search (search_tickets, using the database's full-text index) against an
+unindexed LIKE scan over title, description, client and user.
+
+Usage:
+    python benchmarks/ticket_search.py [--tickets 200000] [--repeat 20] [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+WORDS = ('printer', 'email', 'outlook', 'password', 'reset', 'network', 'switch', 'firewall', 'backup',
+         'server', 'laptop', 'monitor', 'license', 'update', 'install', 'slow', 'error', 'login', 'share',
+         'drive', 'phone', 'wifi', 'account', 'locked', 'scanner', 'invoice', 'database', 'crash')
+
+QUERIES = ('vpn', 'printer error', 'password reset locked', 'backup fail', 'client 7 vpn')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickets', type=int, default=200000, help='number of synthetic tickets')
+    parser.add_argument('--repeat', type=int, default=20, help='timed repetitions per query')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+    
+    # Point the app at a scratch database before importing it
+    workdir = tempfile.mkdtemp(prefix='oncall-bench-')
+    os.environ['DATABASE_URL'] = os.getenv('BENCH_DATABASE_URL', f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from app import app, db, Ticket, apply_ticket_filters, get_search_backend, parse_search_terms, search_tickets
+    
+    rng = random.Random(42)
+    with app.app_context():
+        print(f"Inserting {args.tickets} tickets...")
+        start = datetime(2020, 1, 1)
+        batch = []
+        for i in range(args.tickets):
+            # Roughly 1% of tickets mention the VPN
+            words = rng.sample(WORDS, 12) + (['vpn', 'disconnects'] if i % 100 == 0 else [])
+            batch.append({
+                'ticket_id': str(i + 1),
+                'title': ' '.join(words[:4]).capitalize(),
+                'description': ' '.join(words[4:]) + f' ticket number {i + 1}',
+                'created_at': start + timedelta(minutes=i),
+                'priority': ('Low', 'Medium', 'High', 'Critical')[i % 4],
+                'status': 'Open',
+                'client': f'Client {i % 50}',
+                'user': f'User {i % 500}',
+                'notified': False
+            })
+            if len(batch) == 10000:
+                db.session.execute(Ticket.__table__.insert(), batch)
+                batch = []
+        if batch:
+            db.session.execute(Ticket.__table__.insert(), batch)
+        db.session.commit()
+        
+        def timed(func):
+            samples = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                func()
+                samples.append((time.perf_counter() - t0) * 1000)
+            return round(statistics.median(samples), 3)
+        
+        def like_scan(text, filters):
+            query = apply_ticket_filters(Ticket.query, filters)
+            for term in parse_search_terms(text):
+                pattern = f'%{term}%'
+                query = query.filter(db.or_(Ticket.title.ilike(pattern), Ticket.description.ilike(pattern),
+                                            Ticket.client.ilike(pattern), Ticket.user.ilike(pattern)))
+            return query.order_by(Ticket.created_at.desc()).limit(20).all()
+        
+        backend = get_search_backend()
+        print(f"Search backend: {backend}")
+        last_week = {'created_from': start + timedelta(minutes=args.tickets) - timedelta(days=7)}
+        cases = [(text, {}) for text in QUERIES] + [('vpn', last_week)]
+        results = {'tickets': args.tickets, 'repeat': args.repeat, 'backend': backend, 'queries': []}
+        for text, filters in cases:
+            matches = len(search_tickets(text, filters, limit=20)[0])
+            search_ms = timed(lambda: search_tickets(text, filters, limit=20))
+            like_ms = timed(lambda: like_scan(text, filters))
+            label = text + (' (last week)' if filters else '')
+            results['queries'].append({'query': label, 'results': matches, 'search_ms': search_ms, 'like_scan_ms': like_ms})
+            print(f"{label:>28}: {matches:>3} results | full-text {search_ms:8.3f} ms | LIKE scan {like_ms:8.3f} ms")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Load test for the Atera webhook endpoint.
+
+Starts the app under Waitress in a separate process on a scratch database with
+one technician on call for a holiday (so every new ticket queues an SMS), then
+sends bursts of signed ticket webhooks from a pool of client threads. Reports how long the endpoint
+takes to accept an event, the sustained event rate, and the time from sending a
+webhook to its SMS being queued in the notification outbox. No Twilio
+credentials are configured, so queued messages fail without leaving the machine.
+
+Usage:
+    python benchmarks/webhook_load.py [--bursts 5] [--burst-size 500] [--clients 16]
+                                      [--pause 1.0] [--output results.json]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+
+SECRET = 'load-test-secret'
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    def at(fraction):
+        return round(values[min(len(values) - 1, int(fraction * len(values)))] * 1000, 1)
+    return {'p50': at(0.5), 'p95': at(0.95), 'p99': at(0.99), 'max': at(1.0), 'mean': round(statistics.mean(values) * 1000, 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bursts', type=int, default=5, help='number of bursts')
+    parser.add_argument('--burst-size', type=int, default=500, help='webhooks per burst (one new ticket each)')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent sending threads')
+    parser.add_argument('--pause', type=float, default=1.0, help='seconds between bursts')
+    parser.add_argument('--threads', type=int, default=8, help='Waitress threads')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+    
+    # Point the app at a scratch database before importing it
+    workdir = tempfile.mkdtemp(prefix='oncall-bench-')
+    os.environ['DATABASE_URL'] = os.getenv('BENCH_DATABASE_URL', f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, root)
+    from app import app, db, Holiday, Notification, OnCallSchedule, Technician, Ticket, save_setting, sign_webhook
+    
+    with app.app_context():
+        save_setting('webhook_secret', SECRET)
+        technician = Technician(name='Load Test', phone='+15550000000', email='load@example.com')
+        db.session.add(technician)
+        db.session.add(Holiday(name='Load Test Day', date=datetime.now().date()))
+        db.session.flush()
+        now = datetime.now()
+        db.session.add(OnCallSchedule(technician_id=technician.id, start_date=now - timedelta(days=1),
+                                      end_date=now + timedelta(days=1)))
+        db.session.commit()
+    
+    # Run the server in its own process so the load generator doesn't compete with it for the GIL
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    log = open(os.path.join(workdir, 'server.log'), 'w')
+    server = subprocess.Popen([sys.executable, '-m', 'waitress', '--host=127.0.0.1', f'--port={port}',
+                               f'--threads={args.threads}', 'app:app'],
+                              cwd=root, env=dict(os.environ, PYTHONPATH=root), stdout=log, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}/webhooks/atera"
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline or server.poll() is not None:
+                raise SystemExit(f"Server did not start, see {log.name}")
+            time.sleep(0.1)
+    
+    local = threading.local()
+    sent_at = {}
+    
+    def send(ticket_id):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        body = json.dumps({
+            'TicketID': ticket_id,
+            'TicketTitle': f"Load test ticket {ticket_id}",
+            'TicketCreatedDate': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'TicketPriority': 'Critical',
+            'TicketStatus': 'Open',
+            'CustomerName': f"Client {ticket_id % 20}",
+            'EndUserFirstName': 'Load',
+            'EndUserLastName': 'Test'
+        }).encode()
+        timestamp = int(time.time())
+        sent_at[str(ticket_id)] = datetime.now()
+        start = time.perf_counter()
+        response = local.session.post(url, data=body, headers={
+            'Content-Type': 'application/json',
+            'X-Webhook-Timestamp': str(timestamp),
+            'X-Webhook-Signature': sign_webhook(SECRET, timestamp, body)
+        })
+        return response.status_code, time.perf_counter() - start
+    
+    accept_latencies = []
+    statuses = {}
+    burst_rates = []
+    next_id = 1
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        for burst in range(args.bursts):
+            ticket_ids = range(next_id, next_id + args.burst_size)
+            next_id += args.burst_size
+            start = time.perf_counter()
+            results = list(pool.map(send, ticket_ids))
+            elapsed = time.perf_counter() - start
+            burst_rates.append(args.burst_size / elapsed)
+            for status, latency in results:
+                statuses[status] = statuses.get(status, 0) + 1
+                accept_latencies.append(latency)
+            print(f"Burst {burst + 1}: {args.burst_size} webhooks in {elapsed:.2f}s ({burst_rates[-1]:.0f}/s)")
+            time.sleep(args.pause)
+    
+    # Wait for the server to ingest everything it accepted
+    expected = args.bursts * args.burst_size
+    deadline = time.monotonic() + 60
+    with app.app_context():
+        while time.monotonic() < deadline:
+            if Notification.query.count() >= statuses.get(202, 0):
+                break
+            time.sleep(0.2)
+        rows = (db.session.query(Ticket.ticket_id, Notification.created_at)
+                .join(Notification, Notification.ticket_id == Ticket.id).all())
+        stored = Ticket.query.count()
+    enqueue_latencies = [max(0.0, (created_at - sent_at[ticket_id]).total_seconds()) for ticket_id, created_at in rows]
+    server.terminate()
+    server.wait()
+    log.close()
+    
+    results = {
+        'webhooks_sent': expected,
+        'responses': statuses,
+        'tickets_stored': stored,
+        'notifications_queued': len(rows),
+        'accept_latency_ms': percentiles(accept_latencies),
+        'send_rate_per_second': {'mean': round(statistics.mean(burst_rates)), 'min': round(min(burst_rates))},
+        'receipt_to_sms_queued_ms': percentiles(enqueue_latencies)
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -4,15 +4,25 @@ Run this script to start the application in production mode.
 """
 import os
 from waitress import serve
-from app import app
+from app import app, WEB_THREADS, MAX_EVENT_STREAMS, start_worker
 
 # Configuration
 PORT = 8000  # Change this to your preferred port
 HOST = '0.0.0.0'  # Listen on all interfaces
+THREADS = WEB_THREADS  # Set with the WEB_THREADS environment variable (also sizes the database pool)
+# Each live dashboard stream holds a thread for as long as it is open
+THREADS += MAX_EVENT_STREAMS
+
+# Run the ticket poller in this process too. Set EMBEDDED_WORKER=false when running
+# worker.py separately (e.g. with several web servers behind a load balancer).
+EMBEDDED_WORKER = os.getenv('EMBEDDED_WORKER', 'true').lower() in ('1', 'true', 'yes')
 
 if __name__ == '__main__':
     print(f"Starting On-Call Ticket Monitor in production mode on {HOST}:{PORT}")
     print("Press Ctrl+C to stop the server")
     
+    if EMBEDDED_WORKER:
+        start_worker()
+    
     # Start the server
-    serve(app, host=HOST, port=PORT, threads=4)
+    serve(app, host=HOST, port=PORT, threads=THREADS)
@@ -43,37 +43,6 @@ function formatDate(dateString) {
     return new Date(dateString).toLocaleDateString(undefined, options);
 }
 
-// Check if current time is within business hours (client-side estimation)
-function isBusinessHours() {
-    const now = new Date();
-    const day = now.getDay(); // 0 = Sunday, 6 = Saturday
-    const hour = now.getHours();
-    
-    // Default business hours (9 AM - 5 PM, Monday to Friday)
-    // This is just a client-side estimation - actual check is done server-side
-    return day > 0 && day < 6 && hour >= 9 && hour < 17;
-}
-
-// Update business hours status indicator
-function updateBusinessHoursStatus() {
-    const statusElement = document.getElementById('business-hours-status');
-    if (!statusElement) return;
-    
-    if (isBusinessHours()) {
-        statusElement.textContent = 'Within Business Hours';
-        statusElement.className = 'badge bg-success';
-    } else {
-        statusElement.textContent = 'After Hours';
-        statusElement.className = 'badge bg-danger';
-    }
-}
-
-// Call this function when page loads and set interval to update
-if (document.getElementById('business-hours-status')) {
-    updateBusinessHoursStatus();
-    setInterval(updateBusinessHoursStatus, 60000); // Update every minute
-}
-
 // Handle refresh tickets button
 document.addEventListener('DOMContentLoaded', function() {
     const refreshButton = document.getElementById('refresh-tickets');
@@ -95,13 +64,25 @@ document.addEventListener('DOMContentLoaded', function() {
                             lastCheckElement.textContent = data.last_check;
                         }
                         
-                        // Show success message
-                        showAlert('success', 'Tickets refreshed successfully! Reloading page...');
-                        
-                        // Reload page after a short delay to show new tickets
-                        setTimeout(() => {
-                            window.location.reload();
-                        }, 1500);
+                        if (document.body.dataset.live === 'connected') {
+                            // New tickets arrive through the live update stream
+                            showAlert('success', 'Tickets refreshed successfully!');
+                            refreshButton.disabled = false;
+                            refreshButton.textContent = originalText;
+                        } else {
+                            // Show success message
+                            showAlert('success', 'Tickets refreshed successfully! Reloading page...');
+                            
+                            // Reload page after a short delay to show new tickets
+                            setTimeout(() => {
+                                window.location.reload();
+                            }, 1500);
+                        }
+                    } else if (data.in_progress) {
+                        // Another fetch is already running; its tickets arrive when it finishes
+                        showAlert('info', data.message);
+                        refreshButton.disabled = false;
+                        refreshButton.textContent = originalText;
                     } else {
                         // Show error message
                         showAlert('danger', 'Error refreshing tickets: ' + data.message);
@@ -0,0 +1,13 @@
+"""
+Shared test setup. The app reads its configuration when imported, so the database is
+chosen here, before any test module imports it: TEST_DATABASE_URL if set, otherwise
+a scratch SQLite database.
+"""
+import os
+import sys
+import tempfile
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+os.environ['DATABASE_URL'] = TEST_DATABASE_URL or 'sqlite:///' + os.path.join(
+    tempfile.mkdtemp(prefix='oncall-tests-'), 'oncall.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,67 @@
+"""
+Version counters behind the in-process caches and the HTTP validators.
+"""
+import time
+from datetime import timezone
+
+import pytest
+
+import app as oncall
+
+@pytest.fixture
+def client():
+    """Test client logged in as a test user"""
+    with oncall.app.app_context():
+        user = oncall.User.query.filter_by(username='cache-test').first()
+        if user is None:
+            user = oncall.User(username='cache-test', password='unused')
+            oncall.db.session.add(user)
+            oncall.db.session.commit()
+        user_id = str(user.id)
+    client = oncall.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = user_id
+    return client
+
+def test_only_schedule_changes_rebuild_schedule_caches():
+    with oncall.app.app_context():
+        oncall.get_data_version()
+        index = oncall.get_on_call_index()
+        calendar = oncall.get_business_calendar()
+
+        # New tickets and SMS outcomes only bump the data version
+        version, _ = oncall.get_data_version()
+        oncall.bump_data_version()
+        oncall.db.session.commit()
+        assert oncall.get_data_version()[0] == version + 1
+        assert oncall.get_on_call_index() is index
+        assert oncall.get_business_calendar() is calendar
+
+        oncall.bump_schedule_version()
+        oncall.db.session.commit()
+        assert oncall.get_data_version()[0] == version + 2
+        assert oncall.get_on_call_index() is not index
+        assert oncall.get_business_calendar() is not calendar
+
+@pytest.fixture
+def server_timezone(monkeypatch):
+    """Run the server in a timezone far from UTC"""
+    monkeypatch.setenv('TZ', 'Asia/Kolkata')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_last_modified_is_utc(client, server_timezone):
+    with oncall.app.app_context():
+        oncall.bump_data_version()
+        oncall.db.session.commit()
+        _, updated_at = oncall.get_data_version()
+
+    response = client.get('/holidays')
+    assert response.status_code == 200
+    assert response.last_modified == updated_at.astimezone(timezone.utc).replace(microsecond=0)
+
+    # The browser sends the date back and gets 304 while nothing changed
+    response = client.get('/holidays', headers={'If-Modified-Since': response.headers['Last-Modified']})
+    assert response.status_code == 304
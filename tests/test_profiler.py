@@ -0,0 +1,24 @@
+"""
+Request profiler: statements are recorded without their parameter values.
+"""
+import json
+
+import app as oncall
+
+def test_profiles_do_not_keep_parameter_values(monkeypatch):
+    monkeypatch.setattr(oncall, 'PROFILE_REQUESTS', True)
+    profiler = oncall.RequestProfiler()
+    monkeypatch.setattr(oncall, 'request_profiler', profiler)
+    secret = 'atera-key-that-must-not-leak'
+
+    with oncall.app.app_context():
+        profiler.start('POST', '/settings', 'settings')
+        for _ in range(oncall.PROFILE_REPEAT_THRESHOLD):
+            oncall.db.session.execute(oncall.db.text('SELECT :value'), {'value': secret})
+        profile = profiler.finish(200)
+
+    data = profile.to_dict(queries=True)
+    assert secret not in json.dumps(data)
+    assert len(data['queries']) == oncall.PROFILE_REPEAT_THRESHOLD
+    # Repeats with the same parameters are still told apart
+    assert data['repeated_queries'][0]['identical'] == oncall.PROFILE_REPEAT_THRESHOLD - 1
@@ -0,0 +1,104 @@
+"""
+Scheduled sync against the fake Atera server from the benchmarks.
+"""
+import os
+import sys
+import threading
+
+import pytest
+
+import app as oncall
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from fake_atera import FakeAteraServer
+
+SYNC_STATE_KEYS = ('atera_api_key', 'atera_sync_last_ticket_id', 'atera_sync_last_created', 'atera_update_scan_last')
+
+@pytest.fixture
+def atera(monkeypatch):
+    """A fake Atera server with three pages of open tickets, and a sync that hasn't run yet"""
+    server = FakeAteraServer(tickets=2 * oncall.ATERA_PAGE_SIZE + 20).start()
+    monkeypatch.setattr(oncall.atera_client, 'base_url', server.url)
+    monkeypatch.setattr(oncall, 'ENRICHMENT_ENABLED', False)
+    with oncall.app.app_context():
+        saved = {key: oncall.get_state(key) for key in SYNC_STATE_KEYS}
+        for key in SYNC_STATE_KEYS:
+            oncall.save_state(key, '')
+        oncall.save_setting('atera_api_key', 'test-key')
+    yield server
+    server.stop()
+    with oncall.app.app_context():
+        ticket_ids = [str(ticket['TicketID']) for ticket in server.tickets]
+        rows = [row.id for row in oncall.Ticket.query.filter(oncall.Ticket.ticket_id.in_(ticket_ids))]
+        if rows:
+            oncall.TicketChange.query.filter(oncall.TicketChange.ticket_id.in_(rows)).delete(synchronize_session=False)
+            oncall.Notification.query.filter(oncall.Notification.ticket_id.in_(rows)).delete(synchronize_session=False)
+            oncall.Ticket.query.filter(oncall.Ticket.id.in_(rows)).delete(synchronize_session=False)
+            oncall.db.session.commit()
+        oncall.save_setting('atera_api_key', saved.pop('atera_api_key'))
+        for key, value in saved.items():
+            oncall.save_state(key, value)
+
+def test_update_scan_reuses_pages_fetched_by_sync(atera):
+    with oncall.app.app_context():
+        # The first sync walks the whole list; the update scan that follows fetches nothing more
+        assert len(oncall.fetch_tickets_from_atera()) == len(atera.tickets)
+        assert atera.stats['requests'] == 3
+        assert oncall.get_last_sync_stats()['tickets_scanned'] == len(atera.tickets)
+
+        # The next sync stops after the first page; the scan carries on from the second
+        atera.update_ticket(len(atera.tickets), TicketTitle='Changed on the first page')
+        atera.update_ticket(1, TicketTitle='Changed on the last page')
+        oncall.save_state('atera_update_scan_last', '')
+        before = atera.stats['requests']
+        assert oncall.fetch_tickets_from_atera() == []
+        assert atera.stats['requests'] - before == 3
+        assert oncall.get_last_sync_stats()['tickets_updated'] == 2
+        titles = {ticket.ticket_id: ticket.title for ticket in oncall.Ticket.query.filter(
+            oncall.Ticket.ticket_id.in_([str(len(atera.tickets)), '1']))}
+        assert titles == {str(len(atera.tickets)): 'Changed on the first page', '1': 'Changed on the last page'}
+
+def test_failed_sync_raises_and_records_the_check_once(atera, monkeypatch):
+    monkeypatch.setattr(oncall.atera_client, 'max_retries', 0)
+    atera.error_rate = 1.0
+    with oncall.app.app_context():
+        oncall.save_state('last_ticket_check', '')
+        with pytest.raises(oncall.AteraAPIError):
+            oncall.fetch_tickets_from_atera()
+        last_check = oncall.get_state('last_ticket_check')
+        assert last_check == oncall.format_datetime(oncall.datetime.strptime(last_check, '%Y-%m-%d %H:%M'))
+
+def test_waiters_share_the_leaders_error():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(10)
+        raise oncall.AteraAPIError("Atera is down")
+    fetcher = oncall.SingleFlightFetcher(fetch, min_interval=60, wait_timeout=10)
+    errors = []
+    def call():
+        with oncall.app.app_context():
+            try:
+                fetcher()
+            except oncall.AteraAPIError as e:
+                errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(10)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    waiter.join(0.2)
+    release.set()
+    leader.join(10)
+    waiter.join(10)
+    assert len(calls) == 1
+    assert len(errors) == 2 and errors[0] is errors[1]
+
+    # The failed fetch isn't reused: the next caller tries Atera again
+    release.clear()
+    threading.Timer(0.1, release.set).start()
+    call()
+    assert len(calls) == 2 and len(errors) == 3
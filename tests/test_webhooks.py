@@ -0,0 +1,174 @@
+"""
+Webhooks: signature checks, and which events create tickets and page on-call and
+which only update tickets that are already stored.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app as oncall
+
+CLIENT = 'Webhook Check'
+WATERMARK_TICKET_ID = 5000
+SECRET = 'webhook-test-secret'
+
+def atera_ticket(ticket_id, status='Open', **fields):
+    """An Atera ticket as sent by a webhook"""
+    return dict({
+        'TicketID': ticket_id,
+        'TicketTitle': 'Server down',
+        'TicketCreatedDate': '2025-06-01T03:00:00Z',
+        'TicketStatus': status,
+        'TicketPriority': 'High',
+        'CustomerName': CLIENT
+    }, **fields)
+
+def ingest(*tickets):
+    """Run one webhook batch, as the ingest thread does"""
+    with oncall.app.app_context():
+        oncall.webhook_ingestor.ingest([(time.monotonic(), ticket_data) for ticket_data in tickets])
+
+def stored(ticket_id):
+    with oncall.app.app_context():
+        return oncall.Ticket.query.filter_by(ticket_id=str(ticket_id)).first()
+
+def notification_count():
+    with oncall.app.app_context():
+        return oncall.Notification.query.count()
+
+@pytest.fixture(autouse=True)
+def paging_setup(monkeypatch):
+    """A technician on call and a holiday today (so every new ticket pages), and a sync watermark"""
+    # Keep the queued notifications in the outbox instead of sending them
+    monkeypatch.setattr(oncall.notification_dispatcher, 'dispatch_pending', lambda: None)
+    with oncall.app.app_context():
+        now = datetime.now()
+        technician = oncall.Technician(name='Webhook Tech', phone='+15550000001', email='tech@example.com')
+        holiday = oncall.Holiday(name='Webhook Holiday', date=now.date())
+        oncall.db.session.add_all([technician, holiday])
+        oncall.db.session.flush()
+        oncall.db.session.add(oncall.OnCallSchedule(technician_id=technician.id, start_date=now - timedelta(days=1),
+                                                    end_date=now + timedelta(days=1), tier=1))
+        oncall.bump_schedule_version()
+        oncall.db.session.commit()
+        technician_id, holiday_id = technician.id, holiday.id
+        watermark = {key: oncall.get_state(key) for key in ('atera_sync_last_ticket_id', 'atera_sync_last_created')}
+        oncall.save_sync_watermark({'ticket_id': WATERMARK_TICKET_ID,
+                                    'created_at': datetime(2025, 1, 1, tzinfo=timezone.utc)})
+    yield
+    with oncall.app.app_context():
+        ticket_ids = [ticket.id for ticket in oncall.Ticket.query.filter_by(client=CLIENT)]
+        if ticket_ids:
+            oncall.Notification.query.filter(oncall.Notification.ticket_id.in_(ticket_ids)).delete(synchronize_session=False)
+            oncall.TicketChange.query.filter(oncall.TicketChange.ticket_id.in_(ticket_ids)).delete(synchronize_session=False)
+            oncall.Ticket.query.filter(oncall.Ticket.id.in_(ticket_ids)).delete(synchronize_session=False)
+        oncall.OnCallSchedule.query.filter_by(technician_id=technician_id).delete()
+        oncall.Technician.query.filter_by(id=technician_id).delete()
+        oncall.Holiday.query.filter_by(id=holiday_id).delete()
+        oncall.bump_schedule_version()
+        oncall.db.session.commit()
+        for key, value in watermark.items():
+            oncall.save_state(key, value)
+
+def signed_post(client, body, timestamp=None, secret=SECRET):
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    return client.post('/webhooks/atera', data=body, content_type='application/json', headers={
+        'X-Webhook-Timestamp': str(timestamp),
+        'X-Webhook-Signature': oncall.sign_webhook(secret, timestamp, body)
+    })
+
+def test_signature_verification():
+    body = json.dumps(atera_ticket(WATERMARK_TICKET_ID + 1)).encode()
+    now = int(time.time())
+    signature = oncall.sign_webhook(SECRET, now, body)
+    assert oncall.verify_webhook_signature(SECRET, str(now), signature, body)
+    assert not oncall.verify_webhook_signature('other-secret', str(now), signature, body)
+    assert not oncall.verify_webhook_signature(SECRET, str(now), signature, body + b' ')
+    assert not oncall.verify_webhook_signature(SECRET, str(now + 1), signature, body)
+    assert not oncall.verify_webhook_signature(SECRET, str(now), None, body)
+    assert not oncall.verify_webhook_signature(SECRET, 'yesterday', signature, body)
+
+@pytest.mark.parametrize('skew', [-oncall.WEBHOOK_SIGNATURE_TOLERANCE - 60, oncall.WEBHOOK_SIGNATURE_TOLERANCE + 60],
+                         ids=['replayed', 'future'])
+def test_signature_outside_tolerance_is_rejected(skew):
+    body = json.dumps(atera_ticket(WATERMARK_TICKET_ID + 1)).encode()
+    timestamp = int(time.time()) + skew
+    assert not oncall.verify_webhook_signature(SECRET, str(timestamp), oncall.sign_webhook(SECRET, timestamp, body), body)
+
+def test_endpoint_rejects_bad_requests(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(oncall.webhook_ingestor, 'submit', lambda tickets: submitted.append(tickets) or True)
+    client = oncall.app.test_client()
+    body = json.dumps(atera_ticket(WATERMARK_TICKET_ID + 1)).encode()
+
+    monkeypatch.setattr(oncall, 'get_webhook_secret', lambda: '')
+    assert signed_post(client, body).status_code == 404
+
+    monkeypatch.setattr(oncall, 'get_webhook_secret', lambda: SECRET)
+    assert signed_post(client, body, secret='other-secret').status_code == 401
+    assert signed_post(client, body, timestamp=int(time.time()) - oncall.WEBHOOK_SIGNATURE_TOLERANCE - 60).status_code == 401
+    assert signed_post(client, b'{"TicketTitle": "No ID"}').status_code == 400
+    assert not submitted
+
+    response = signed_post(client, body)
+    assert response.status_code == 202
+    assert response.get_json() == {'accepted': 1}
+    assert submitted == [[json.loads(body)]]
+
+def test_open_ticket_newer_than_watermark_pages():
+    before = notification_count()
+    ingest(atera_ticket(WATERMARK_TICKET_ID + 1))
+    assert stored(WATERMARK_TICKET_ID + 1) is not None
+    assert notification_count() == before + 1
+
+@pytest.mark.parametrize('ticket_data', [
+    atera_ticket(WATERMARK_TICKET_ID + 2, status='Closed'),
+    atera_ticket(WATERMARK_TICKET_ID + 3, status='Resolved'),
+    atera_ticket(WATERMARK_TICKET_ID - 1000),
+], ids=['closed', 'resolved', 'older-than-watermark'])
+def test_other_events_do_not_create_tickets(ticket_data):
+    before = notification_count()
+    ingest(ticket_data)
+    assert stored(ticket_data['TicketID']) is None
+    assert notification_count() == before
+
+def test_closed_event_updates_stored_ticket():
+    ticket_id = WATERMARK_TICKET_ID + 4
+    ingest(atera_ticket(ticket_id))
+    before = notification_count()
+    ingest(atera_ticket(ticket_id, status='Closed'))
+    assert stored(ticket_id).status == 'Closed'
+    assert notification_count() == before
+
+def test_batch_keeps_latest_event_per_ticket():
+    ticket_id = WATERMARK_TICKET_ID + 7
+    before = notification_count()
+    ingest(atera_ticket(ticket_id, TicketTitle='Server down'), atera_ticket(ticket_id, TicketTitle='Server down again'))
+    with oncall.app.app_context():
+        tickets = oncall.Ticket.query.filter_by(ticket_id=str(ticket_id)).all()
+        assert [ticket.title for ticket in tickets] == ['Server down again']
+    assert notification_count() == before + 1
+
+def test_incomplete_payload_does_not_hold_up_batch(monkeypatch):
+    ingestor = oncall.WebhookIngestor()
+    release = threading.Event()
+    def look_up(ticket_id):
+        release.wait(10)
+        return atera_ticket(int(ticket_id))
+    monkeypatch.setattr(ingestor, 'look_up', look_up)
+
+    thin, complete = WATERMARK_TICKET_ID + 5, WATERMARK_TICKET_ID + 6
+    with oncall.app.app_context():
+        ingestor.ingest([(time.monotonic(), {'TicketID': thin}), (time.monotonic(), atera_ticket(complete))])
+    assert stored(complete) is not None
+    assert stored(thin) is None
+
+    # The looked-up ticket is queued again and stored by the ingest thread
+    release.set()
+    deadline = time.monotonic() + 10
+    while stored(thin) is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert stored(thin) is not None
@@ -0,0 +1,40 @@
+"""
+Background worker for On-Call Ticket Monitor.
+Runs the scheduled ticket check and delivers SMS notifications, separately from the web server.
+
+Several workers can run at once (on one or more machines sharing the database);
+only one of them polls Atera at a time, the others take over if it stops.
+Set METRICS_PORT to serve Prometheus metrics for this process on that port.
+"""
+import logging
+import os
+import signal
+import time
+from app import app, start_metrics_server, start_worker, stop_worker
+
+running = True
+
+def handle_stop(signum, frame):
+    global running
+    running = False
+
+if __name__ == '__main__':
+    print("Starting On-Call Ticket Monitor background worker")
+    print("Press Ctrl+C to stop the worker")
+    
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s in %(module)s: %(message)s')
+    app.logger.setLevel(logging.INFO)
+    
+    signal.signal(signal.SIGINT, handle_stop)
+    signal.signal(signal.SIGTERM, handle_stop)
+    
+    metrics_port = os.getenv('METRICS_PORT')
+    if metrics_port:
+        start_metrics_server(int(metrics_port))
+    
+    start_worker()
+    try:
+        while running:
+            time.sleep(1)
+    finally:
+        stop_worker()